@@ -0,0 +1,415 @@
+"""Prometheus/OpenMetrics exporter for a fleet of SOK batteries."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from typing import Callable, Iterable, Mapping, Sequence
+
+import async_timeout
+from bleak import BleakScanner
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError
+
+from sok_ble.exceptions import SokError
+from sok_ble.sok_bluetooth_device import SokBluetoothDevice
+from sok_ble.sok_state import SokStateStore
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (metric name, type, help, value getter)
+_DEVICE_METRICS: list[
+    tuple[str, str, str, Callable[[SokBluetoothDevice], float | int | None]]
+] = [
+    ("sok_voltage_volts", "gauge", "Pack voltage.", lambda d: d.voltage),
+    ("sok_current_amperes", "gauge", "Pack current.", lambda d: d.current),
+    ("sok_soc_percent", "gauge", "State of charge.", lambda d: d.soc),
+    (
+        "sok_temperature_celsius",
+        "gauge",
+        "Pack temperature.",
+        lambda d: d.temperature,
+    ),
+    (
+        "sok_cell_voltage_max_volts",
+        "gauge",
+        "Highest cell voltage.",
+        lambda d: d.cell_voltage_max,
+    ),
+    (
+        "sok_cell_voltage_min_volts",
+        "gauge",
+        "Lowest cell voltage.",
+        lambda d: d.cell_voltage_min,
+    ),
+    (
+        "sok_cell_voltage_avg_volts",
+        "gauge",
+        "Average cell voltage.",
+        lambda d: d.cell_voltage_avg,
+    ),
+    (
+        "sok_cell_voltage_median_volts",
+        "gauge",
+        "Median cell voltage.",
+        lambda d: d.cell_voltage_median,
+    ),
+    (
+        "sok_cell_voltage_delta_volts",
+        "gauge",
+        "Difference between highest and lowest cell voltage.",
+        lambda d: d.cell_voltage_delta,
+    ),
+    (
+        "sok_cell_index_max",
+        "gauge",
+        "1-based index of the highest cell, matching the cell label.",
+        lambda d: None if d.cell_index_max is None else d.cell_index_max + 1,
+    ),
+    (
+        "sok_cell_index_min",
+        "gauge",
+        "1-based index of the lowest cell, matching the cell label.",
+        lambda d: None if d.cell_index_min is None else d.cell_index_min + 1,
+    ),
+    (
+        "sok_poll_duration_seconds",
+        "gauge",
+        "Duration of the last successful poll.",
+        lambda d: d.last_update_duration,
+    ),
+    (
+        "sok_last_success_timestamp_seconds",
+        "gauge",
+        "Unix time of the last successful poll.",
+        lambda d: d.last_update,
+    ),
+    (
+        "sok_stale",
+        "gauge",
+        "1 while values are restored from the state file and not yet polled.",
+        lambda d: int(d.stale),
+    ),
+    (
+        "sok_samples_total",
+        "counter",
+        "Successful polls.",
+        lambda d: d.num_samples,
+    ),
+    (
+        "sok_connect_retries_total",
+        "counter",
+        "Failed BLE connection attempts.",
+        lambda d: d.num_connect_retries,
+    ),
+    (
+        "sok_command_retries_total",
+        "counter",
+        "Retried BLE commands.",
+        lambda d: d.num_command_retries,
+    ),
+]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_metrics(
+    devices: Iterable[SokBluetoothDevice],
+    poll_errors: dict[str, int] | None = None,
+) -> str:
+    """Render device attributes in the Prometheus text exposition format."""
+    poll_errors = poll_errors or {}
+    devices = list(devices)
+    labels = {
+        id(dev): 'address="{}",name="{}"'.format(
+            _escape(dev.address), _escape(dev.name or "")
+        )
+        for dev in devices
+    }
+    lines: list[str] = []
+
+    for name, kind, help_text, getter in _DEVICE_METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for dev in devices:
+            value = getter(dev)
+            if value is not None:
+                lines.append(f"{name}{{{labels[id(dev)]}}} {value}")
+
+    lines.append("# HELP sok_cell_voltage_volts Individual cell voltage.")
+    lines.append("# TYPE sok_cell_voltage_volts gauge")
+    for dev in devices:
+        for idx, cell in enumerate(dev.cell_voltages or (), start=1):
+            lines.append(
+                f'sok_cell_voltage_volts{{{labels[id(dev)]},cell="{idx}"}} {cell}'
+            )
+
+    lines.append("# HELP sok_poll_errors_total Failed polls.")
+    lines.append("# TYPE sok_poll_errors_total counter")
+    for dev in devices:
+        errors = poll_errors.get(dev.address, 0)
+        lines.append(f"sok_poll_errors_total{{{labels[id(dev)]}}} {errors}")
+
+    return "\n".join(lines) + "\n"
+
+
+class SokExporter:
+    """Poll a fleet of batteries in the background and serve cached metrics.
+
+    Each device is polled by its own task on a staggered schedule; a semaphore
+    caps how many BLE connections are open at once. The exposition payload is
+    rebuilt after every poll so scrapes only return prebuilt bytes.
+
+    With a ``state_store`` the last known values of every battery are served,
+    flagged as stale, before the first scan or poll completes.
+    """
+
+    def __init__(
+        self,
+        addresses: Sequence[str],
+        interval: float = 60.0,
+        max_connections: int = 1,
+        adapter: str | None = None,
+        scan_timeout: float = 10.0,
+        poll_timeout: float = 90.0,
+        state_store: SokStateStore | None = None,
+        num_cells: Mapping[str, int] | None = None,
+    ) -> None:
+        self._addresses = list(addresses)
+        self._interval = interval
+        self._adapter = adapter
+        self._scan_timeout = scan_timeout
+        self._poll_timeout = poll_timeout
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._state_store = state_store
+        # Cell counts per address; others are detected on their first poll
+        self._num_cells = dict(num_cells or {})
+
+        self.devices: dict[str, SokBluetoothDevice] = {}
+        self.poll_errors: dict[str, int] = {address: 0 for address in addresses}
+        self._placeholders: set[str] = set()
+        self._tasks: list[asyncio.Task[None]] = []
+
+        if state_store is not None:
+            stored = set(state_store.addresses())
+            for address in self._addresses:
+                if address in stored:
+                    # Placeholder until the device is found by a scan
+                    self.devices[address] = SokBluetoothDevice(
+                        BLEDevice(address, None, None),
+                        adapter=adapter,
+                        state_store=state_store,
+                        num_cells=self._num_cells.get(address),
+                    )
+                    self._placeholders.add(address)
+        self._refresh_payload()
+
+    @property
+    def payload(self) -> bytes:
+        """Return the cached exposition payload."""
+        return self._payload
+
+    def _refresh_payload(self) -> None:
+        """Rebuild the cached exposition payload."""
+        self._payload = render_metrics(self.devices.values(), self.poll_errors).encode()
+
+    async def _resolve(self, address: str) -> SokBluetoothDevice | None:
+        """Return the device for ``address``, scanning for it if needed."""
+        device = self.devices.get(address)
+        if device is not None and address not in self._placeholders:
+            return device
+
+        kwargs = {"adapter": self._adapter} if self._adapter else {}
+        ble_device = await BleakScanner.find_device_by_address(
+            address, timeout=self._scan_timeout, **kwargs
+        )
+        if ble_device is None:
+            logger.debug("Device %s not found", address)
+            return None
+
+        if device is None:
+            device = SokBluetoothDevice(
+                ble_device,
+                adapter=self._adapter,
+                state_store=self._state_store,
+                num_cells=self._num_cells.get(address),
+            )
+            self.devices[address] = device
+        else:
+            device.set_ble_device(ble_device)
+            self._placeholders.discard(address)
+        return device
+
+    async def poll_once(self, address: str) -> None:
+        """Poll a single device and refresh the cached payload."""
+        async with self._semaphore:
+            try:
+                # Bound the poll so one silent battery cannot stall the fleet
+                async with async_timeout.timeout(self._poll_timeout):
+                    device = await self._resolve(address)
+                    if device is None:
+                        self.poll_errors[address] += 1
+                    else:
+                        await device.async_update()
+            except (SokError, BleakError, asyncio.TimeoutError) as err:
+                logger.warning("Polling %s failed: %s", address, err)
+                self.poll_errors[address] += 1
+            except Exception:
+                logger.exception("Unexpected error polling %s", address)
+                self.poll_errors[address] += 1
+        self._refresh_payload()
+
+    async def _poll_loop(self, address: str, delay: float) -> None:
+        """Poll ``address`` forever every ``interval`` seconds."""
+        await asyncio.sleep(delay)
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                await self.poll_once(address)
+            except Exception:
+                # Keep polling; a dead task would serve frozen values forever
+                logger.exception("Poll loop error for %s", address)
+                self.poll_errors[address] += 1
+            elapsed = loop.time() - started
+            await asyncio.sleep(max(0.0, self._interval - elapsed))
+
+    def start(self) -> None:
+        """Start background polling of all configured devices."""
+        count = len(self._addresses)
+        for idx, address in enumerate(self._addresses):
+            delay = self._interval * idx / count
+            self._tasks.append(asyncio.create_task(self._poll_loop(address, delay)))
+
+    async def stop(self) -> None:
+        """Cancel background polling."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer a single HTTP request from the cached payload."""
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.split()
+            if parts[:2] in ([b"GET", b"/metrics"], [b"GET", b"/"]):
+                status, content_type, body = "200 OK", CONTENT_TYPE, self._payload
+            else:
+                status, content_type, body = (
+                    "404 Not Found",
+                    "text/plain; charset=utf-8",
+                    b"Not Found\n",
+                )
+
+            writer.write(
+                (
+                    f"HTTP/1.1 {status}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode()
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "0.0.0.0", port: int = 9713) -> None:
+        """Start polling and serve metrics until cancelled."""
+        self.start()
+        server = await asyncio.start_server(self.handle_client, host, port)
+        logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def _parse_num_cells(value: str) -> tuple[str, int]:
+    """Parse an ``ADDRESS=N`` cell count option."""
+    address, sep, count = value.rpartition("=")
+    try:
+        cells = int(count)
+    except ValueError:
+        cells = 0
+    if not sep or not address or cells < 1:
+        raise argparse.ArgumentTypeError(f"expected ADDRESS=N, got {value!r}")
+    return address, cells
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Entry point for the ``sok-ble-exporter`` console script."""
+    parser = argparse.ArgumentParser(
+        description="Export SOK battery telemetry as Prometheus metrics."
+    )
+    parser.add_argument("addresses", nargs="+", help="BLE addresses to poll")
+    parser.add_argument("--host", default="0.0.0.0", help="Listen address")
+    parser.add_argument("--port", type=int, default=9713, help="Listen port")
+    parser.add_argument(
+        "--interval", type=float, default=60.0, help="Seconds between polls"
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=1,
+        help="Maximum concurrent BLE connections",
+    )
+    parser.add_argument(
+        "--poll-timeout",
+        type=float,
+        default=90.0,
+        help="Seconds before a single battery poll is abandoned",
+    )
+    parser.add_argument(
+        "--num-cells",
+        type=_parse_num_cells,
+        action="append",
+        default=[],
+        metavar="ADDRESS=N",
+        help="Cell count of a battery; detected on the first poll if omitted",
+    )
+    parser.add_argument("--adapter", default=None, help="Bluetooth adapter")
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help="SQLite file for last known values, served at startup",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Debug logging")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    state_store = SokStateStore(args.state_file) if args.state_file else None
+    exporter = SokExporter(
+        args.addresses,
+        interval=args.interval,
+        max_connections=args.max_connections,
+        adapter=args.adapter,
+        poll_timeout=args.poll_timeout,
+        num_cells=dict(args.num_cells),
+        state_store=state_store,
+    )
+    try:
+        asyncio.run(exporter.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if state_store is not None:
+            state_store.close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
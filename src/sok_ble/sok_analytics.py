@@ -0,0 +1,195 @@
+"""Incremental cell-imbalance and anomaly detection for SOK batteries."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Sequence
+
+from sok_ble.sok_bluetooth_device import SokBluetoothDevice
+
+logger = logging.getLogger(__name__)
+
+EVENT_CELL_DRIFT = "cell_drift"
+EVENT_CELL_PERSISTENT_HIGH = "cell_persistent_high"
+EVENT_CELL_PERSISTENT_LOW = "cell_persistent_low"
+EVENT_CURRENT_STEP = "current_step"
+EVENT_TEMPERATURE_STEP = "temperature_step"
+
+
+@dataclass(frozen=True)
+class SokAnalyticsEvent:
+    """A threshold crossing detected by ``SokCellAnalyzer``.
+
+    ``value`` and ``threshold`` depend on ``kind``:
+
+    - ``cell_drift``: EWMA drift of the cell from the pack mean and the drift
+      threshold, in volts.
+    - ``cell_persistent_high``/``cell_persistent_low``: the streak length and
+      ``persistence_samples``, in samples.
+    - ``current_step``: change in current and the step threshold, in amperes.
+    - ``temperature_step``: change in temperature and the step threshold, in
+      degrees Celsius.
+    """
+
+    kind: str
+    value: float
+    threshold: float
+    cell: int | None = None
+
+
+class SokCellAnalyzer:
+    """Track per-cell trends of a single battery from streaming samples.
+
+    State is a fixed number of floats per cell, so memory does not grow with
+    the number of samples. Events are reported once when a threshold is
+    crossed and re-armed when the value falls back below it.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.1,
+        drift_threshold: float = 0.03,
+        persistence_samples: int = 10,
+        current_step: float = 20.0,
+        temperature_step: float = 5.0,
+    ) -> None:
+        self.alpha = alpha
+        self.drift_threshold = drift_threshold
+        self.persistence_samples = persistence_samples
+        self.current_step = current_step
+        self.temperature_step = temperature_step
+
+        self.num_samples = 0
+        self.cell_mean: list[float] = []
+        self.cell_variance: list[float] = []
+        self.cell_drift: list[float] = []
+        self._drift_active: list[bool] = []
+
+        self.high_cell: int | None = None
+        self.high_streak = 0
+        self.low_cell: int | None = None
+        self.low_streak = 0
+
+        self._last_current: float | None = None
+        self._last_temperature: float | None = None
+
+    def _reset_cells(self, cells: Sequence[float]) -> None:
+        """Start tracking a new set of cells."""
+        count = len(cells)
+        self.cell_mean = list(cells)
+        self.cell_variance = [0.0] * count
+        self.cell_drift = [0.0] * count
+        self._drift_active = [False] * count
+        self.high_cell = self.low_cell = None
+        self.high_streak = self.low_streak = 0
+
+    def update(
+        self,
+        cell_voltages: Sequence[float] | None,
+        current: float | None = None,
+        temperature: float | None = None,
+    ) -> list[SokAnalyticsEvent]:
+        """Feed a sample and return the events it triggered."""
+        events: list[SokAnalyticsEvent] = []
+        self.num_samples += 1
+
+        if cell_voltages:
+            self._update_cells(cell_voltages, events)
+
+        if current is not None:
+            last = self._last_current
+            if last is not None and abs(current - last) >= self.current_step:
+                events.append(
+                    SokAnalyticsEvent(
+                        EVENT_CURRENT_STEP, current - last, self.current_step
+                    )
+                )
+            self._last_current = current
+
+        if temperature is not None:
+            last = self._last_temperature
+            if last is not None and abs(temperature - last) >= self.temperature_step:
+                events.append(
+                    SokAnalyticsEvent(
+                        EVENT_TEMPERATURE_STEP,
+                        temperature - last,
+                        self.temperature_step,
+                    )
+                )
+            self._last_temperature = temperature
+
+        for event in events:
+            logger.debug("Analytics event: %s", event)
+        return events
+
+    def update_from_device(self, device: SokBluetoothDevice) -> list[SokAnalyticsEvent]:
+        """Feed the latest sample of ``device``."""
+        return self.update(device.cell_voltages, device.current, device.temperature)
+
+    def _update_cells(
+        self, cells: Sequence[float], events: list[SokAnalyticsEvent]
+    ) -> None:
+        """Update per-cell statistics in a single pass over ``cells``."""
+        if len(cells) != len(self.cell_mean):
+            self._reset_cells(cells)
+
+        alpha = self.alpha
+        pack_mean = sum(cells) / len(cells)
+        high_idx = low_idx = 0
+        for idx, value in enumerate(cells):
+            # Exponentially weighted mean and variance
+            diff = value - self.cell_mean[idx]
+            incr = alpha * diff
+            self.cell_mean[idx] += incr
+            self.cell_variance[idx] = (1 - alpha) * (
+                self.cell_variance[idx] + diff * incr
+            )
+
+            drift = self.cell_drift[idx] + alpha * (
+                value - pack_mean - self.cell_drift[idx]
+            )
+            self.cell_drift[idx] = drift
+            active = abs(drift) >= self.drift_threshold
+            if active and not self._drift_active[idx]:
+                events.append(
+                    SokAnalyticsEvent(
+                        EVENT_CELL_DRIFT, drift, self.drift_threshold, idx
+                    )
+                )
+            self._drift_active[idx] = active
+
+            if value > cells[high_idx]:
+                high_idx = idx
+            if value < cells[low_idx]:
+                low_idx = idx
+
+        if high_idx == low_idx:
+            # All cells equal, no meaningful extreme
+            self.high_cell = self.low_cell = None
+            self.high_streak = self.low_streak = 0
+            return
+
+        self.high_streak = self.high_streak + 1 if high_idx == self.high_cell else 1
+        self.high_cell = high_idx
+        if self.high_streak == self.persistence_samples:
+            events.append(
+                SokAnalyticsEvent(
+                    EVENT_CELL_PERSISTENT_HIGH,
+                    self.high_streak,
+                    self.persistence_samples,
+                    high_idx,
+                )
+            )
+
+        self.low_streak = self.low_streak + 1 if low_idx == self.low_cell else 1
+        self.low_cell = low_idx
+        if self.low_streak == self.persistence_samples:
+            events.append(
+                SokAnalyticsEvent(
+                    EVENT_CELL_PERSISTENT_LOW,
+                    self.low_streak,
+                    self.persistence_samples,
+                    low_idx,
+                )
+            )
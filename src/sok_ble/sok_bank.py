@@ -0,0 +1,134 @@
+"""Aggregate several SOK batteries into bank-level metrics."""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Sequence
+
+from sok_ble.sok_bluetooth_device import SokBluetoothDevice
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SokBankSample:
+    """Bank-level metrics produced by ``SokBank.aggregate``."""
+
+    voltage: float | None
+    current: float | None
+    soc: float | None
+    capacity: float | None
+    cell_voltage_min: float | None
+    cell_voltage_max: float | None
+    cell_voltage_delta: float | None
+    # (battery address, 0-based cell index) of the lowest and highest cell
+    cell_min_location: tuple[str, int] | None
+    cell_max_location: tuple[str, int] | None
+    num_strings: int
+    # Batteries left out because their values were restored, not polled
+    num_stale: int = 0
+
+
+class SokBank:
+    """A bank of batteries wired as parallel strings of series batteries.
+
+    ``strings`` lists the batteries of each series string; the strings are
+    connected in parallel. Strings with a battery that has not reported yet,
+    or only has stale values restored from a state store, are left out of
+    the electrical totals. Fresh cells in those strings still count.
+    """
+
+    def __init__(self, strings: Sequence[Sequence[SokBluetoothDevice]]) -> None:
+        self.strings = [list(string) for string in strings if string]
+
+    @classmethod
+    def parallel(cls, devices: Sequence[SokBluetoothDevice]) -> SokBank:
+        """Return a bank of batteries wired in parallel."""
+        return cls([[device] for device in devices])
+
+    @classmethod
+    def series(cls, devices: Sequence[SokBluetoothDevice]) -> SokBank:
+        """Return a bank of batteries wired in series."""
+        return cls([list(devices)])
+
+    def aggregate(self) -> SokBankSample:
+        """Combine the latest battery samples into bank-level metrics."""
+        voltages: list[float] = []
+        currents: list[float] = []
+        socs: list[float] = []
+        capacities: list[float] = []
+        socs_complete = capacities_complete = True
+        low: tuple[float, str, int] | None = None
+        high: tuple[float, str, int] | None = None
+        num_stale = 0
+
+        for string in self.strings:
+            complete = True
+            string_voltage: list[float] = []
+            string_current: list[float] = []
+            string_soc: list[int] = []
+            string_capacity: list[float] = []
+            for device in string:
+                if device.stale:
+                    num_stale += 1
+                    complete = False
+                    continue
+
+                cells = device.cell_voltages
+                idx_min = device.cell_index_min
+                idx_max = device.cell_index_max
+                if cells and idx_min is not None and idx_max is not None:
+                    if low is None or cells[idx_min] < low[0]:
+                        low = (cells[idx_min], device.address, idx_min)
+                    if high is None or cells[idx_max] > high[0]:
+                        high = (cells[idx_max], device.address, idx_max)
+
+                if device.voltage is None or device.current is None:
+                    complete = False
+                    continue
+                string_voltage.append(device.voltage)
+                string_current.append(device.current)
+                if device.soc is not None:
+                    string_soc.append(device.soc)
+                if device.capacity is not None:
+                    string_capacity.append(device.capacity)
+
+            if not complete:
+                logger.debug("Skipping incomplete string: %s", string)
+                continue
+            voltages.append(math.fsum(string_voltage))
+            currents.append(math.fsum(string_current) / len(string_current))
+            # A series string is limited by its weakest battery
+            if len(string_soc) == len(string):
+                socs.append(min(string_soc))
+            else:
+                socs_complete = False
+            if len(string_capacity) == len(string):
+                capacities.append(min(string_capacity))
+            else:
+                capacities_complete = False
+
+        capacity = math.fsum(capacities) if capacities and capacities_complete else None
+        soc: float | None = None
+        if socs and socs_complete:
+            if capacity:
+                # Weight each string's SOC by its capacity
+                soc = math.fsum(s * c for s, c in zip(socs, capacities)) / capacity
+            else:
+                soc = math.fsum(socs) / len(socs)
+
+        return SokBankSample(
+            voltage=math.fsum(voltages) / len(voltages) if voltages else None,
+            current=math.fsum(currents) if currents else None,
+            soc=soc,
+            capacity=capacity,
+            cell_voltage_min=low[0] if low else None,
+            cell_voltage_max=high[0] if high else None,
+            cell_voltage_delta=high[0] - low[0] if low and high else None,
+            cell_min_location=(low[1], low[2]) if low else None,
+            cell_max_location=(high[1], high[2]) if high else None,
+            num_strings=len(voltages),
+            num_stale=num_stale,
+        )
@@ -6,8 +6,9 @@ import asyncio
 import logging
 import statistics
 import struct
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Optional
+from typing import Any, AsyncIterator, Callable, Optional
 
 import async_timeout
 from bleak.backends.characteristic import BleakGATTCharacteristic
@@ -15,8 +16,10 @@ from bleak.backends.device import BLEDevice
 from bleak.exc import BleakError
 
 from sok_ble.const import UUID_RX, UUID_TX, _sok_command
-from sok_ble.exceptions import BLEConnectionError
-from sok_ble.sok_parser import SokParser
+from sok_ble.exceptions import BLEConnectionError, InvalidResponseError
+from sok_ble.sok_frame import SokFrameAssembler, validate_frame
+from sok_ble.sok_parser import CELLS_PER_FRAME, SokParser
+from sok_ble.sok_state import SokStateStore
 
 logger = logging.getLogger(__name__)
 
@@ -31,14 +34,65 @@ except Exception:  # pragma: no cover - optional dependency
     establish_connection = None  # type: ignore[misc]
 
 
+def _is_number(value: Any) -> bool:
+    """Return True for an int or float that is not a bool."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_int(value: Any) -> bool:
+    """Return True for an int that is not a bool."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_cell_list(value: Any) -> bool:
+    """Return True for a list of cell voltages."""
+    return isinstance(value, list) and all(_is_number(cell) for cell in value)
+
+
+# Upper bound on cell frames requested while detecting the cell count
+_MAX_CELL_FRAMES = 8
+
+# Frames rejected by an ``accept`` predicate before a command gives up
+_MAX_SKIPPED_FRAMES = 2
+
+# Attributes persisted by a SokStateStore and the check a stored value must
+# pass to be restored, mirroring the checks in async_update
+_STATE_ATTRS: dict[str, Callable[[Any], bool]] = {
+    "voltage": _is_number,
+    "current": _is_number,
+    "soc": _is_int,
+    "temperature": _is_number,
+    "capacity": _is_number,
+    "num_cycles": _is_int,
+    "cell_voltages": _is_cell_list,
+    "num_samples": _is_int,
+    "last_update": _is_number,
+    "last_update_duration": _is_number,
+    "num_connect_retries": _is_int,
+    "num_command_retries": _is_int,
+}
+
+
+class _RepeatedFramesError(InvalidResponseError):
+    """Raised when a command keeps returning frames already received."""
+
+
 class SokBluetoothDevice:
     """Minimal BLE interface for a SOK battery."""
 
     def __init__(
-        self, ble_device: BLEDevice, adapter: Optional[str] | None = None
+        self,
+        ble_device: BLEDevice,
+        adapter: Optional[str] | None = None,
+        state_store: SokStateStore | None = None,
+        num_cells: int | None = None,
     ) -> None:
         self._ble_device = ble_device
         self._adapter = adapter
+        # None until the cell count is detected on the first poll
+        self._num_cells = num_cells
+        self._state_store = state_store
+        self._stored_name: str | None = None
 
         self.voltage: float | None = None
         self.current: float | None = None
@@ -50,6 +104,61 @@ class SokBluetoothDevice:
 
         # Housekeeping
         self.num_samples = 0
+        self.last_update_duration: float | None = None
+        self.num_connect_retries = 0
+        self.num_command_retries = 0
+        self.last_update: float | None = None
+        # True while attributes hold values restored from the state store
+        self.stale = False
+
+        if state_store is not None:
+            state = state_store.load(ble_device.address)
+            if state is not None:
+                self._restore_state(state)
+
+    @property
+    def address(self) -> str:
+        """Return the BLE address of the battery."""
+        return self._ble_device.address
+
+    @property
+    def name(self) -> str | None:
+        """Return the advertised name, falling back to the stored one."""
+        return self._ble_device.name or self._stored_name
+
+    def set_ble_device(self, ble_device: BLEDevice) -> None:
+        """Replace the BLEDevice used for connections."""
+        self._ble_device = ble_device
+
+    def _restore_state(self, state: dict[str, Any]) -> None:
+        """Populate attributes from a persisted state."""
+        for attr, is_valid in _STATE_ATTRS.items():
+            if attr not in state or state[attr] is None:
+                continue
+            if is_valid(state[attr]):
+                setattr(self, attr, state[attr])
+            else:
+                logger.warning(
+                    "Ignoring invalid stored %s for %s: %r",
+                    attr,
+                    self.address,
+                    state[attr],
+                )
+        name = state.get("name")
+        self._stored_name = name if isinstance(name, str) else None
+        if self._num_cells is None and self.cell_voltages:
+            # Reuse the stored cell count so warm starts skip detection
+            self._num_cells = len(self.cell_voltages)
+        self.stale = True
+        logger.debug("Restored state for %s: %s", self.address, state)
+
+    def _save_state(self) -> None:
+        """Persist the current attributes to the state store."""
+        if self._state_store is None:
+            return
+        state = {attr: getattr(self, attr) for attr in _STATE_ATTRS}
+        state["name"] = self.name
+        self._state_store.save(self.address, state)
 
     @asynccontextmanager
     async def _connect(self) -> AsyncIterator[BleakClientWithServiceCache]:
@@ -81,6 +190,7 @@ class SokBluetoothDevice:
                 break
             except (BleakError, asyncio.TimeoutError) as err:
                 last_err = err
+                self.num_connect_retries += 1
                 logger.debug(
                     "BLE connect attempt %s failed for %s: %s",
                     attempt + 1,
@@ -110,34 +220,58 @@ class SokBluetoothDevice:
             logger.debug("Disconnected from %s", self._ble_device.address)
 
     async def _send_command(
-        self, client: BleakClientWithServiceCache, cmd: int, expected: int
+        self,
+        client: BleakClientWithServiceCache,
+        cmd: int,
+        expected: int,
+        accept: Callable[[bytes], bool] | None = None,
     ) -> bytes:
-        """Send a command and return the response bytes with the given header."""
+        """Send a command and return the response bytes with the given header.
+
+        If ``accept`` is given, frames it rejects are skipped and the command
+        is sent again. Skips are expected and not counted as retries; after
+        ``_MAX_SKIPPED_FRAMES`` of them ``_RepeatedFramesError`` is raised.
+        """
 
-        for attempt in range(2):
+        for attempt in range(3):
             try:
+                skipped = 0
                 start_notify = getattr(client, "start_notify", None)
                 if start_notify is None:
-                    await client.write_gatt_char(UUID_TX, _sok_command(cmd))
-                    data = bytes(await client.read_gatt_char(UUID_RX))
-                    return data
+                    while True:
+                        await client.write_gatt_char(UUID_TX, _sok_command(cmd))
+                        data = bytes(await client.read_gatt_char(UUID_RX))
+                        data = validate_frame(data, expected)
+                        if accept is None or accept(data):
+                            return data
+                        skipped = self._skip_frame(data, skipped)
 
                 queue: asyncio.Queue[bytes] = asyncio.Queue()
+                assembler = SokFrameAssembler()
 
                 def handler(_: BleakGATTCharacteristic, data: bytearray) -> None:
-                    queue.put_nowait(bytes(data))
+                    for frame in assembler.feed(bytes(data)):
+                        queue.put_nowait(frame)
 
                 await client.start_notify(UUID_RX, handler)
                 try:
                     await client.write_gatt_char(UUID_TX, _sok_command(cmd))
                     while True:
                         data = await asyncio.wait_for(queue.get(), 5.0)
-                        if struct.unpack_from(">H", data)[0] == expected:
+                        if struct.unpack_from(">H", data)[0] != expected:
+                            continue
+                        if accept is None or accept(data):
                             return data
+                        skipped = self._skip_frame(data, skipped)
+                        await client.write_gatt_char(UUID_TX, _sok_command(cmd))
                 finally:
                     await client.stop_notify(UUID_RX)
-            except BleakError as err:
-                if attempt == 0:
+            except _RepeatedFramesError:
+                # Sending the command again would only repeat the same frames
+                raise
+            except (BleakError, InvalidResponseError, asyncio.TimeoutError) as err:
+                if attempt < 2:
+                    self.num_command_retries += 1
                     logger.debug(
                         "BLE command attempt failed for %s: %s",
                         self._ble_device.address,
@@ -151,9 +285,63 @@ class SokBluetoothDevice:
             f"from {self._ble_device.address}"
         )
 
+    def _skip_frame(self, data: bytes, skipped: int) -> int:
+        """Record a frame rejected by ``accept`` and return the new count."""
+        skipped += 1
+        if skipped >= _MAX_SKIPPED_FRAMES:
+            raise _RepeatedFramesError(
+                f"Only unwanted frames from {self.address}: {data.hex()}"
+            )
+        logger.debug("Skipping frame %s, requesting again", data.hex())
+        return skipped
+
+    async def _read_cell_frames(
+        self, client: BleakClientWithServiceCache
+    ) -> list[bytes]:
+        """Return the cell frames, detecting the cell count if unknown.
+
+        Packs with more than ``CELLS_PER_FRAME`` cells report them across
+        several cell frames. Frames already received are skipped the same way
+        whether or not the count is known. Without a known count, frames are
+        requested until one has empty slots, ``_MAX_CELL_FRAMES`` is reached,
+        or the battery only repeats frames already received.
+        """
+        cell_frames: list[bytes] = []
+        seen: set[int] = set()
+        detecting = self._num_cells is None
+        while True:
+            if not detecting:
+                assert self._num_cells is not None
+                if len(cell_frames) * CELLS_PER_FRAME >= self._num_cells:
+                    break
+            elif len(cell_frames) >= _MAX_CELL_FRAMES:
+                break
+
+            logger.debug("Send C2")
+            try:
+                data = await self._send_command(
+                    client, 0xC2, 0xCCF4, lambda frame: frame[2] not in seen
+                )
+            except _RepeatedFramesError:
+                if detecting and cell_frames:
+                    # Nothing new after repeated requests: no more cells
+                    break
+                raise
+            logger.debug(
+                "Recv 0x%04X: %s",
+                struct.unpack_from(">H", data)[0],
+                data.hex(),
+            )
+            seen.add(data[2])
+            cell_frames.append(data)
+            if detecting and SokParser.cell_frame_is_partial(data):
+                break
+        return cell_frames
+
     async def async_update(self) -> None:
         """Poll the device for all telemetry and update attributes."""
-        responses: dict[int, bytes] = {}
+        responses: dict[int, bytes | list[bytes]] = {}
+        start = time.monotonic()
         async with self._connect() as client:
             logger.debug("Send C1")
             data = await self._send_command(client, 0xC1, 0xCCF0)
@@ -182,14 +370,8 @@ class SokBluetoothDevice:
             )
             responses[0xCCF3] = data
 
-            logger.debug("Send C2")
-            data = await self._send_command(client, 0xC2, 0xCCF4)
-            logger.debug(
-                "Recv 0x%04X: %s",
-                struct.unpack_from(">H", data)[0],
-                data.hex(),
-            )
-            responses[0xCCF4] = data
+            cell_frames = await self._read_cell_frames(client)
+            responses[0xCCF4] = cell_frames
 
         parsed = SokParser.parse_all(responses)
         logger.debug("Parsed update: %s", parsed)
@@ -218,8 +400,15 @@ class SokBluetoothDevice:
         self.cell_voltages = (
             list(cell_voltages) if isinstance(cell_voltages, list) else None
         )
+        if self._num_cells is None and self.cell_voltages:
+            self._num_cells = len(self.cell_voltages)
+            logger.debug("Detected %s cells on %s", self._num_cells, self.address)
 
         self.num_samples += 1
+        self.last_update_duration = time.monotonic() - start
+        self.last_update = time.time()
+        self.stale = False
+        self._save_state()
 
     # Derived metrics -----------------------------------------------------
 
@@ -254,22 +443,33 @@ class SokBluetoothDevice:
             return None
         return statistics.median(cells)
 
+    def _cell_extremes(self) -> tuple[int, int] | None:
+        """Return the indices of the lowest and highest cell in one pass."""
+        cells = self.cell_voltages
+        if not cells:
+            return None
+        idx_min = idx_max = 0
+        for idx, value in enumerate(cells):
+            if value < cells[idx_min]:
+                idx_min = idx
+            elif value > cells[idx_max]:
+                idx_max = idx
+        return idx_min, idx_max
+
     @property
     def cell_voltage_delta(self) -> float | None:
-        if self.cell_voltage_max is None or self.cell_voltage_min is None:
+        extremes = self._cell_extremes()
+        if extremes is None or self.cell_voltages is None:
             return None
-        return self.cell_voltage_max - self.cell_voltage_min
+        idx_min, idx_max = extremes
+        return self.cell_voltages[idx_max] - self.cell_voltages[idx_min]
 
     @property
     def cell_index_max(self) -> int | None:
-        cells = self.cell_voltages
-        if not cells:
-            return None
-        return cells.index(max(cells))
+        extremes = self._cell_extremes()
+        return extremes[1] if extremes else None
 
     @property
     def cell_index_min(self) -> int | None:
-        cells = self.cell_voltages
-        if not cells:
-            return None
-        return cells.index(min(cells))
+        extremes = self._cell_extremes()
+        return extremes[0] if extremes else None
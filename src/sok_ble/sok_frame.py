@@ -0,0 +1,81 @@
+"""Framing helpers for SOK BLE responses."""
+
+from __future__ import annotations
+
+import logging
+import struct
+
+from sok_ble.exceptions import InvalidResponseError
+
+logger = logging.getLogger(__name__)
+
+# Every response frame is 20 bytes and starts with a 0xCCFx header
+FRAME_LENGTH = 20
+FRAME_START = 0xCC
+
+
+def _is_frame_start(data: bytes | bytearray) -> bool:
+    """Return True if ``data`` begins with a response header."""
+    return len(data) >= 2 and data[0] == FRAME_START and data[1] & 0xF0 == 0xF0
+
+
+def _find_frame_start(data: bytes | bytearray) -> int:
+    """Return the offset of the first response header in ``data`` or -1.
+
+    A trailing 0xCC is treated as a possible header split across chunks.
+    """
+    start = data.find(FRAME_START)
+    while start != -1:
+        if start + 1 == len(data) or _is_frame_start(data[start : start + 2]):
+            return start
+        start = data.find(FRAME_START, start + 1)
+    return -1
+
+
+def validate_frame(data: bytes, expected: int) -> bytes:
+    """Check a response frame and return it trimmed to ``FRAME_LENGTH``.
+
+    SOK responses carry no checksum, so validation is limited to the header
+    and the frame length.
+    """
+    if len(data) < FRAME_LENGTH:
+        raise InvalidResponseError(
+            f"Frame 0x{expected:04X} too short: {len(data)} bytes"
+        )
+    header = struct.unpack_from(">H", data)[0]
+    if header != expected:
+        raise InvalidResponseError(
+            f"Unexpected frame header 0x{header:04X}, expected 0x{expected:04X}"
+        )
+    return bytes(data[:FRAME_LENGTH])
+
+
+class SokFrameAssembler:
+    """Reassemble response frames from BLE notification chunks."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """Add a notification chunk and return any completed frames."""
+        if self._buffer and _is_frame_start(chunk):
+            # A new header while a frame is pending means the tail was lost
+            logger.debug("Dropping truncated frame: %s", self._buffer.hex())
+            self._buffer.clear()
+
+        self._buffer += chunk
+        frames: list[bytes] = []
+        while self._buffer:
+            start = _find_frame_start(self._buffer)
+            if start == -1:
+                logger.debug("Dropping unframed bytes: %s", self._buffer.hex())
+                self._buffer.clear()
+                break
+            if start:
+                logger.debug("Skipping %s bytes before frame header", start)
+                del self._buffer[:start]
+            if len(self._buffer) < FRAME_LENGTH:
+                break
+            frames.append(bytes(self._buffer[:FRAME_LENGTH]))
+            del self._buffer[:FRAME_LENGTH]
+        return frames
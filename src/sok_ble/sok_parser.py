@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 import logging
-import statistics
+import math
 import struct
-from typing import Dict, Sequence
+from typing import Dict, Mapping, Sequence
 
 from sok_ble.exceptions import InvalidResponseError
 
 logger = logging.getLogger(__name__)
 
+# Each cell frame carries up to four (index, voltage) entries
+CELLS_PER_FRAME = 4
+
 
 # Endian helper functions copied from the reference addon
 
@@ -87,35 +90,64 @@ class SokParser:
         return result
 
     @staticmethod
-    def parse_cells(buf: bytes) -> list[float]:
-        """Parse individual cell voltages."""
+    def _parse_cell_entries(buf: bytes) -> Dict[int, float]:
+        """Return the cell voltages in a cell frame keyed by 1-based index."""
         logger.debug("parse_cells input: %s", buf.hex())
         if len(buf) < 20:
             raise InvalidResponseError("Cells buffer too short")
 
-        cells = [0.0, 0.0, 0.0, 0.0]
-        for x in range(4):
+        entries: Dict[int, float] = {}
+        for x in range(CELLS_PER_FRAME):
             cell_idx = buf[2 + x * 4]
-            cells[cell_idx - 1] = get_le_ushort(buf, 3 + x * 4) / 1000
+            # Index 0 marks an unused slot in the last frame of a pack
+            if cell_idx:
+                entries[cell_idx] = get_le_ushort(buf, 3 + x * 4) / 1000
+        return entries
+
+    @staticmethod
+    def cell_frame_is_partial(buf: bytes) -> bool:
+        """Return True if a cell frame has empty slots, i.e. is the last one."""
+        return any(buf[2 + x * 4] == 0 for x in range(CELLS_PER_FRAME))
+
+    @classmethod
+    def parse_cells(cls, buf: bytes | Sequence[bytes]) -> list[float]:
+        """Parse individual cell voltages from one or more cell frames."""
+        bufs = [buf] if isinstance(buf, (bytes, bytearray)) else buf
+        entries: Dict[int, float] = {}
+        for frame in bufs:
+            entries.update(cls._parse_cell_entries(frame))
+
+        if not entries:
+            raise InvalidResponseError("No cell voltages in cell frames")
+        count = max(entries)
+        if len(entries) != count:
+            missing = sorted(set(range(1, count + 1)) - set(entries))
+            raise InvalidResponseError(f"Missing cell voltages: {missing}")
+
+        cells = [entries[idx] for idx in range(1, count + 1)]
         logger.debug("parse_cells result: %s", cells)
         return cells
 
     @classmethod
     def parse_all(
-        cls, responses: Dict[int, bytes]
+        cls, responses: Mapping[int, bytes | Sequence[bytes]]
     ) -> Dict[str, float | int | list[float]]:
-        """Parse all response buffers into a single dictionary."""
+        """Parse all response buffers into a single dictionary.
+
+        The cell response may be a single frame or a sequence of frames for
+        packs with more than ``CELLS_PER_FRAME`` cells.
+        """
         logger.debug("parse_all input keys: %s", list(responses))
         required = {0xCCF0, 0xCCF2, 0xCCF3, 0xCCF4}
         if not required.issubset(responses):
             raise InvalidResponseError("Missing response buffers")
 
-        info = cls.parse_info(responses[0xCCF0])
-        temperature = cls.parse_temps(responses[0xCCF2])
-        capacity_info = cls.parse_capacity_cycles(responses[0xCCF3])
+        info = cls.parse_info(cls._single(responses[0xCCF0]))
+        temperature = cls.parse_temps(cls._single(responses[0xCCF2]))
+        capacity_info = cls.parse_capacity_cycles(cls._single(responses[0xCCF3]))
         cells = cls.parse_cells(responses[0xCCF4])
 
-        voltage = statistics.mean(cells) * 4
+        voltage = math.fsum(cells)
 
         result = {
             "voltage": voltage,
@@ -128,3 +160,12 @@ class SokParser:
         }
         logger.debug("parse_all result: %s", result)
         return result
+
+    @staticmethod
+    def _single(buf: bytes | Sequence[bytes]) -> bytes:
+        """Return a single frame from a response entry."""
+        if isinstance(buf, (bytes, bytearray)):
+            return bytes(buf)
+        if len(buf) != 1:
+            raise InvalidResponseError("Expected a single response frame")
+        return buf[0]
@@ -0,0 +1,62 @@
+"""SQLite persistence of last-known battery state."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class SokStateStore:
+    """Store the last known state of each battery in a small SQLite file."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS device_state ("
+                "address TEXT PRIMARY KEY, state TEXT NOT NULL)"
+            )
+
+    def load(self, address: str) -> dict[str, Any] | None:
+        """Return the stored state for ``address`` or ``None``."""
+        try:
+            row = self._conn.execute(
+                "SELECT state FROM device_state WHERE address = ?", (address,)
+            ).fetchone()
+        except sqlite3.Error as err:
+            logger.warning("Failed to load state for %s: %s", address, err)
+            return None
+        if row is None:
+            return None
+        try:
+            state = json.loads(row[0])
+        except ValueError:
+            logger.warning("Discarding corrupt state for %s", address)
+            return None
+        return state if isinstance(state, dict) else None
+
+    def save(self, address: str, state: dict[str, Any]) -> None:
+        """Persist ``state`` for ``address``."""
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO device_state (address, state) "
+                    "VALUES (?, ?)",
+                    (address, json.dumps(state)),
+                )
+        except sqlite3.Error as err:
+            logger.warning("Failed to save state for %s: %s", address, err)
+
+    def addresses(self) -> list[str]:
+        """Return the addresses with stored state."""
+        rows = self._conn.execute("SELECT address FROM device_state").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._conn.close()
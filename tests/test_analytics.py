@@ -0,0 +1,73 @@
+import pytest
+
+from sok_ble.sok_analytics import (
+    EVENT_CELL_DRIFT,
+    EVENT_CELL_PERSISTENT_HIGH,
+    EVENT_CELL_PERSISTENT_LOW,
+    EVENT_CURRENT_STEP,
+    EVENT_TEMPERATURE_STEP,
+    SokCellAnalyzer,
+)
+
+
+def kinds(events):
+    return [event.kind for event in events]
+
+
+def test_ewma_mean_and_variance():
+    analyzer = SokCellAnalyzer(alpha=0.5)
+    analyzer.update([3.2, 3.2])
+    analyzer.update([3.4, 3.2])
+
+    assert analyzer.cell_mean == pytest.approx([3.3, 3.2])
+    assert analyzer.cell_variance[0] == pytest.approx(0.01)
+    assert analyzer.cell_variance[1] == 0.0
+
+
+def test_drift_event_fires_once_and_rearms():
+    analyzer = SokCellAnalyzer(alpha=1.0, drift_threshold=0.1)
+
+    events = analyzer.update([3.3, 3.3, 3.3, 3.1])
+    assert [(e.kind, e.cell) for e in events] == [(EVENT_CELL_DRIFT, 3)]
+    assert analyzer.cell_drift[3] == pytest.approx(-0.15)
+
+    assert EVENT_CELL_DRIFT not in kinds(analyzer.update([3.3, 3.3, 3.3, 3.1]))
+    analyzer.update([3.3, 3.3, 3.3, 3.3])
+    assert EVENT_CELL_DRIFT in kinds(analyzer.update([3.3, 3.3, 3.3, 3.1]))
+
+
+def test_persistent_high_and_low_cells():
+    analyzer = SokCellAnalyzer(persistence_samples=3)
+    cells = [3.30, 3.32, 3.28, 3.30]
+
+    assert analyzer.update(cells) == []
+    assert analyzer.update(cells) == []
+    events = analyzer.update(cells)
+
+    assert [(e.kind, e.cell) for e in events] == [
+        (EVENT_CELL_PERSISTENT_HIGH, 1),
+        (EVENT_CELL_PERSISTENT_LOW, 2),
+    ]
+    assert [(e.value, e.threshold) for e in events] == [(3, 3), (3, 3)]
+    assert analyzer.high_streak == 3
+    assert analyzer.update(cells) == []
+
+
+def test_current_and_temperature_steps():
+    analyzer = SokCellAnalyzer(current_step=10.0, temperature_step=3.0)
+    analyzer.update(None, current=1.0, temperature=20.0)
+
+    events = analyzer.update(None, current=25.0, temperature=24.0)
+
+    assert kinds(events) == [EVENT_CURRENT_STEP, EVENT_TEMPERATURE_STEP]
+    assert events[0].value == pytest.approx(24.0)
+    assert events[1].value == pytest.approx(4.0)
+
+
+def test_cell_count_change_resets():
+    analyzer = SokCellAnalyzer()
+    analyzer.update([3.3, 3.2, 3.1, 3.0])
+    analyzer.update([3.3] * 8)
+
+    assert len(analyzer.cell_mean) == 8
+    assert analyzer.high_cell is None
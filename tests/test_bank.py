@@ -0,0 +1,83 @@
+import pytest
+from bleak.backends.device import BLEDevice
+
+from sok_ble.sok_bank import SokBank
+from sok_ble.sok_bluetooth_device import SokBluetoothDevice
+
+
+def make_device(address, voltage, current, soc, capacity, cells):
+    dev = SokBluetoothDevice(BLEDevice(address, "Test", None))
+    dev.voltage = voltage
+    dev.current = current
+    dev.soc = soc
+    dev.capacity = capacity
+    dev.cell_voltages = cells
+    return dev
+
+
+def test_parallel_bank():
+    a = make_device("AA", 13.2, 10.0, 80, 100.0, [3.3, 3.3, 3.3, 3.3])
+    b = make_device("BB", 13.0, 5.0, 50, 200.0, [3.2, 3.3, 3.25, 3.25])
+
+    sample = SokBank.parallel([a, b]).aggregate()
+
+    assert sample.voltage == pytest.approx(13.1)
+    assert sample.current == pytest.approx(15.0)
+    assert sample.capacity == pytest.approx(300.0)
+    assert sample.soc == pytest.approx(60.0)
+    assert sample.cell_voltage_min == pytest.approx(3.2)
+    assert sample.cell_voltage_max == pytest.approx(3.3)
+    assert sample.cell_voltage_delta == pytest.approx(0.1)
+    assert sample.cell_min_location == ("BB", 0)
+    assert sample.cell_max_location == ("AA", 0)
+    assert sample.num_strings == 2
+
+
+def test_series_bank():
+    a = make_device("AA", 13.2, 10.0, 80, 100.0, [3.3] * 4)
+    b = make_device("BB", 13.0, 10.2, 70, 100.0, [3.25] * 4)
+
+    sample = SokBank.series([a, b]).aggregate()
+
+    assert sample.voltage == pytest.approx(26.2)
+    assert sample.current == pytest.approx(10.1)
+    assert sample.soc == pytest.approx(70.0)
+    assert sample.capacity == pytest.approx(100.0)
+    assert sample.num_strings == 1
+
+
+def test_incomplete_string_skipped():
+    a = make_device("AA", 13.2, 10.0, 80, 100.0, [3.3] * 4)
+    b = make_device("BB", None, None, None, None, [3.1] * 4)
+
+    sample = SokBank.parallel([a, b]).aggregate()
+
+    assert sample.voltage == pytest.approx(13.2)
+    assert sample.current == pytest.approx(10.0)
+    assert sample.soc == pytest.approx(80.0)
+    assert sample.cell_min_location == ("BB", 0)
+    assert sample.num_strings == 1
+
+
+def test_empty_bank():
+    sample = SokBank([]).aggregate()
+
+    assert sample.voltage is None
+    assert sample.soc is None
+    assert sample.cell_voltage_delta is None
+    assert sample.num_strings == 0
+
+
+def test_stale_devices_excluded():
+    a = make_device("AA", 13.2, 10.0, 80, 100.0, [3.3] * 4)
+    b = make_device("BB", 12.0, 50.0, 10, 100.0, [2.9] * 4)
+    b.stale = True
+
+    sample = SokBank.parallel([a, b]).aggregate()
+
+    assert sample.voltage == pytest.approx(13.2)
+    assert sample.current == pytest.approx(10.0)
+    assert sample.soc == pytest.approx(80.0)
+    assert sample.cell_min_location == ("AA", 0)
+    assert sample.num_strings == 1
+    assert sample.num_stale == 1
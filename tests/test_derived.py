@@ -26,3 +26,20 @@ def test_cell_voltage_stats():
     assert dev.cell_voltage_delta == pytest.approx(0.15)
     assert dev.cell_index_max == 3
     assert dev.cell_index_min == 2
+
+
+def test_cell_index_ties_use_first_cell():
+    dev = make_device()
+    dev.cell_voltages = [3.2, 3.3, 3.1, 3.3, 3.1]
+
+    assert dev.cell_index_max == 1
+    assert dev.cell_index_min == 2
+    assert dev.cell_voltage_delta == pytest.approx(0.2)
+
+
+def test_cell_stats_without_cells():
+    dev = make_device()
+
+    assert dev.cell_index_max is None
+    assert dev.cell_index_min is None
+    assert dev.cell_voltage_delta is None
@@ -14,6 +14,9 @@ class DummyClient:
             bytes.fromhex("ccf2000000140000000000000000000000000000"),
             bytes.fromhex("ccf3000000003200000000000000000000000000"),
             bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+            # Cell count probes only get the first frame again: a 4-cell pack
+            bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+            bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
         ]
 
     async def connect(self):
@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+
+import pytest
+from bleak.backends.device import BLEDevice
+
+from sok_ble import exporter as exporter_mod
+from sok_ble.exceptions import BLEConnectionError
+from sok_ble.sok_bluetooth_device import SokBluetoothDevice
+from sok_ble.sok_state import SokStateStore
+
+
+def make_device():
+    dev = SokBluetoothDevice(BLEDevice("00:11:22:33:44:55", "Test", None))
+    dev.voltage = 13.066
+    dev.current = 10.0
+    dev.soc = 65
+    dev.temperature = 20.0
+    dev.cell_voltages = [3.269, 3.27, 3.263, 3.264]
+    dev.num_samples = 3
+    dev.last_update_duration = 1.5
+    dev.last_update = 1000.0
+    return dev
+
+
+def test_render_metrics():
+    dev = make_device()
+    dev.current = None
+    text = exporter_mod.render_metrics([dev], {"00:11:22:33:44:55": 2})
+    labels = 'address="00:11:22:33:44:55",name="Test"'
+
+    assert "# TYPE sok_voltage_volts gauge" in text
+    assert f"sok_voltage_volts{{{labels}}} 13.066" in text
+    assert f"sok_soc_percent{{{labels}}} 65" in text
+    assert f'sok_cell_voltage_volts{{{labels},cell="2"}} 3.27' in text
+    # Index metrics use the same 1-based numbering as the cell label
+    assert f"sok_cell_index_min{{{labels}}} 3" in text
+    assert f'sok_cell_voltage_volts{{{labels},cell="3"}} 3.263' in text
+    assert f"sok_cell_index_max{{{labels}}} 2" in text
+    assert f"sok_poll_duration_seconds{{{labels}}} 1.5" in text
+    assert f"sok_samples_total{{{labels}}} 3" in text
+    assert f"sok_connect_retries_total{{{labels}}} 0" in text
+    assert f"sok_poll_errors_total{{{labels}}} 2" in text
+    assert f"sok_last_success_timestamp_seconds{{{labels}}} 1000.0" in text
+    assert f"sok_stale{{{labels}}} 0" in text
+    # Unknown values are omitted rather than exported
+    assert "# TYPE sok_current_amperes gauge" in text
+    assert "sok_current_amperes{" not in text
+
+
+@pytest.mark.asyncio
+async def test_poll_once_refreshes_payload():
+    dev = make_device()
+    calls = []
+
+    async def fake_update():
+        calls.append(True)
+        dev.voltage = 13.5
+
+    dev.async_update = fake_update
+
+    exporter = exporter_mod.SokExporter(["00:11:22:33:44:55"])
+    exporter.devices["00:11:22:33:44:55"] = dev
+    assert b"sok_voltage_volts{" not in exporter.payload
+
+    await exporter.poll_once("00:11:22:33:44:55")
+
+    assert calls == [True]
+    assert b"13.5" in exporter.payload
+
+
+@pytest.mark.asyncio
+async def test_poll_once_counts_errors():
+    dev = make_device()
+
+    async def failing_update():
+        raise BLEConnectionError("boom")
+
+    dev.async_update = failing_update
+
+    exporter = exporter_mod.SokExporter(["00:11:22:33:44:55"])
+    exporter.devices["00:11:22:33:44:55"] = dev
+
+    await exporter.poll_once("00:11:22:33:44:55")
+
+    assert exporter.poll_errors["00:11:22:33:44:55"] == 1
+    assert b"sok_poll_errors_total{" in exporter.payload
+
+
+@pytest.mark.asyncio
+async def test_http_serves_cached_payload():
+    exporter = exporter_mod.SokExporter(["00:11:22:33:44:55"])
+    exporter.devices["00:11:22:33:44:55"] = make_device()
+    exporter._refresh_payload()
+
+    server = await asyncio.start_server(exporter.handle_client, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert body == exporter.payload
+
+
+@pytest.mark.asyncio
+async def test_warm_start_from_state_store(tmp_path, monkeypatch):
+    store = SokStateStore(tmp_path / "state.db")
+    store.save("00:11:22:33:44:55", {"voltage": 13.2, "name": "Test"})
+
+    exporter = exporter_mod.SokExporter(
+        ["00:11:22:33:44:55", "AA:BB:CC:DD:EE:FF"], state_store=store
+    )
+    labels = 'address="00:11:22:33:44:55",name="Test"'
+    assert f"sok_voltage_volts{{{labels}}} 13.2".encode() in exporter.payload
+    assert f"sok_stale{{{labels}}} 1".encode() in exporter.payload
+    assert b"AA:BB:CC:DD:EE:FF" not in exporter.payload
+
+    found = BLEDevice("00:11:22:33:44:55", "Test", None)
+
+    async def fake_find(address, **kwargs):
+        return found
+
+    monkeypatch.setattr(exporter_mod.BleakScanner, "find_device_by_address", fake_find)
+    placeholder = exporter.devices["00:11:22:33:44:55"]
+    assert await exporter._resolve("00:11:22:33:44:55") is placeholder
+    assert placeholder._ble_device is found
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_poll_loop_survives_unexpected_errors():
+    dev = make_device()
+    calls = []
+
+    async def broken_update():
+        calls.append(True)
+        raise ValueError("unexpected")
+
+    dev.async_update = broken_update
+
+    exporter = exporter_mod.SokExporter(["00:11:22:33:44:55"], interval=0.01)
+    exporter.devices["00:11:22:33:44:55"] = dev
+    exporter.start()
+    try:
+        for _ in range(100):
+            if len(calls) >= 3:
+                break
+            await asyncio.sleep(0.01)
+        assert len(calls) >= 3
+        assert not exporter._tasks[0].done()
+        assert exporter.poll_errors["00:11:22:33:44:55"] >= 3
+    finally:
+        await exporter.stop()
+
+
+@pytest.mark.asyncio
+async def test_poll_once_times_out():
+    dev = make_device()
+
+    async def hanging_update():
+        await asyncio.sleep(10)
+
+    dev.async_update = hanging_update
+
+    exporter = exporter_mod.SokExporter(["00:11:22:33:44:55"], poll_timeout=0.01)
+    exporter.devices["00:11:22:33:44:55"] = dev
+
+    await asyncio.wait_for(exporter.poll_once("00:11:22:33:44:55"), 1.0)
+
+    assert exporter.poll_errors["00:11:22:33:44:55"] == 1
+
+
+def test_exporter_starts_with_malformed_state(tmp_path):
+    store = SokStateStore(tmp_path / "state.db")
+    store.save("00:11:22:33:44:55", {"cell_voltages": [3.3, None], "voltage": 13.2})
+
+    exporter = exporter_mod.SokExporter(["00:11:22:33:44:55"], state_store=store)
+
+    assert b"sok_voltage_volts{" in exporter.payload
+    assert b"sok_cell_voltage_volts{" not in exporter.payload
+    store.close()
+
+
+def test_parse_num_cells_option():
+    assert exporter_mod._parse_num_cells("00:11:22:33:44:55=8") == (
+        "00:11:22:33:44:55",
+        8,
+    )
+    with pytest.raises(argparse.ArgumentTypeError):
+        exporter_mod._parse_num_cells("00:11:22:33:44:55")
+
+
+@pytest.mark.asyncio
+async def test_resolve_passes_num_cells(monkeypatch):
+    async def fake_find(address, **kwargs):
+        return BLEDevice(address, "Test", None)
+
+    monkeypatch.setattr(exporter_mod.BleakScanner, "find_device_by_address", fake_find)
+    exporter = exporter_mod.SokExporter(
+        ["00:11:22:33:44:55", "AA:BB:CC:DD:EE:FF"],
+        num_cells={"00:11:22:33:44:55": 16},
+    )
+
+    first = await exporter._resolve("00:11:22:33:44:55")
+    second = await exporter._resolve("AA:BB:CC:DD:EE:FF")
+
+    assert first._num_cells == 16
+    assert second._num_cells is None
@@ -0,0 +1,56 @@
+import pytest
+
+from sok_ble.exceptions import InvalidResponseError
+from sok_ble.sok_frame import SokFrameAssembler, validate_frame
+
+INFO = bytes.fromhex("ccf0000000102700000000000000320041000000")
+CELLS = bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000")
+
+
+def test_validate_frame():
+    assert validate_frame(INFO + b"\x00", 0xCCF0) == INFO
+
+
+def test_validate_frame_too_short():
+    with pytest.raises(InvalidResponseError):
+        validate_frame(INFO[:12], 0xCCF0)
+
+
+def test_validate_frame_wrong_header():
+    with pytest.raises(InvalidResponseError):
+        validate_frame(INFO, 0xCCF2)
+
+
+def test_assembler_reassembles_fragments():
+    assembler = SokFrameAssembler()
+    assert assembler.feed(INFO[:8]) == []
+    assert assembler.feed(INFO[8:]) == [INFO]
+
+
+def test_assembler_splits_joined_frames():
+    assembler = SokFrameAssembler()
+    assert assembler.feed(INFO + CELLS[:5]) == [INFO]
+    assert assembler.feed(CELLS[5:]) == [CELLS]
+
+
+def test_assembler_drops_truncated_frame():
+    assembler = SokFrameAssembler()
+    assert assembler.feed(INFO[:12]) == []
+    assert assembler.feed(CELLS) == [CELLS]
+
+
+def test_assembler_skips_leading_garbage():
+    assembler = SokFrameAssembler()
+    assert assembler.feed(b"\x00\x01" + INFO) == [INFO]
+
+
+def test_assembler_ignores_cc_bytes_in_garbage():
+    assembler = SokFrameAssembler()
+    # 0x0CCC is a plausible cell voltage and must not be taken for a header
+    assert assembler.feed(b"\x0c\xcc\x0c\x00" + INFO) == [INFO]
+
+
+def test_assembler_header_split_across_chunks():
+    assembler = SokFrameAssembler()
+    assert assembler.feed(b"\x00\xcc") == []
+    assert assembler.feed(INFO[1:]) == [INFO]
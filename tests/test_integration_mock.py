@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 import pytest
@@ -32,6 +33,9 @@ async def test_async_update_full_flow(monkeypatch):
         bytes.fromhex("ccf2000000140000000000000000000000000000"),
         bytes.fromhex("ccf3000000003200000000000000000000000000"),
         bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+        # Cell count probes only get the first frame again: a 4-cell pack
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
     ]
 
     @asynccontextmanager
@@ -65,3 +69,195 @@ async def test_async_update_full_flow(monkeypatch):
     assert dev.cell_index_max == 1
     assert dev.cell_index_min == 2
     assert dev.num_samples == 1
+
+
+class NotifyClient:
+    """Client that delivers responses as fragmented notifications."""
+
+    def __init__(self, notifications):
+        self._notifications = list(notifications)
+        self._handler = None
+        self.writes = 0
+
+    async def start_notify(self, uuid, handler):
+        self._handler = handler
+
+    async def stop_notify(self, uuid):
+        self._handler = None
+
+    async def write_gatt_char(self, uuid, data):
+        self.writes += 1
+        for chunk in self._notifications.pop(0):
+            self._handler(None, bytearray(chunk))
+
+
+@pytest.mark.asyncio
+async def test_send_command_reassembles_and_rerequests(monkeypatch):
+    frame = bytes.fromhex("ccf0000000102700000000000000320041000000")
+
+    async def fast_sleep(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(device_mod.asyncio, "sleep", fast_sleep)
+
+    # First request yields a wrong frame, second a valid fragmented one
+    client = NotifyClient(
+        [
+            [bytes.fromhex("ccf1") + bytes(18)],
+            [frame[:7], frame[7:15], frame[15:]],
+        ]
+    )
+    real_wait_for = asyncio.wait_for
+    monkeypatch.setattr(
+        device_mod.asyncio,
+        "wait_for",
+        lambda awaitable, timeout: real_wait_for(awaitable, 0.01),
+    )
+    dev = device_mod.SokBluetoothDevice(BLEDevice("00:11:22:33:44:55", "Test", None))
+
+    data = await dev._send_command(client, 0xC1, 0xCCF0)
+
+    assert data == frame
+    assert client.writes == 2
+    assert dev.num_command_retries == 1
+
+
+@pytest.mark.asyncio
+async def test_async_update_eight_cells(monkeypatch):
+    responses = [
+        bytes.fromhex("ccf0000000102700000000000000320041000000"),
+        bytes.fromhex("ccf2000000140000000000000000000000000000"),
+        bytes.fromhex("ccf3000000003200000000000000000000000000"),
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+        # Repeated first frame is rejected and re-requested
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+        bytes.fromhex("ccf405c50c0006c60c0007bf0c0008c00c000000"),
+    ]
+
+    @asynccontextmanager
+    async def fake_connect(self):
+        yield DummyClient(responses)
+
+    async def fast_sleep(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(device_mod.SokBluetoothDevice, "_connect", fake_connect)
+    monkeypatch.setattr(device_mod.asyncio, "sleep", fast_sleep)
+
+    dev = device_mod.SokBluetoothDevice(
+        BLEDevice("00:11:22:33:44:55", "Test", None), num_cells=8
+    )
+
+    await dev.async_update()
+
+    assert dev.cell_voltages == [3.269, 3.27, 3.263, 3.264] * 2
+    assert dev.voltage == pytest.approx(26.132)
+    # Skipping a frame already received is not a retry
+    assert dev.num_command_retries == 0
+
+
+@pytest.mark.asyncio
+async def test_async_update_detects_cell_count(monkeypatch):
+    base = [
+        bytes.fromhex("ccf0000000102700000000000000320041000000"),
+        bytes.fromhex("ccf2000000140000000000000000000000000000"),
+        bytes.fromhex("ccf3000000003200000000000000000000000000"),
+    ]
+    first = bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000")
+    second = bytes.fromhex("ccf405c50c0006c60c0007bf0c0008c00c000000")
+    # Same battery model as the 8-cell test: frames may repeat before the
+    # next one arrives. Detection ends once probes only return known frames.
+    responses = base + [first, first, second, first, second] + base + [first, second]
+
+    client = DummyClient(responses)
+
+    @asynccontextmanager
+    async def fake_connect(self):
+        yield client
+
+    monkeypatch.setattr(device_mod.SokBluetoothDevice, "_connect", fake_connect)
+
+    dev = device_mod.SokBluetoothDevice(BLEDevice("00:11:22:33:44:55", "Test", None))
+
+    await dev.async_update()
+    assert len(dev.cell_voltages) == 8
+    assert dev.voltage == pytest.approx(26.132)
+
+    # The detected count is reused, so the second poll sends no probe
+    await dev.async_update()
+    assert client._responses == []
+    assert len(dev.cell_voltages) == 8
+
+
+@pytest.mark.asyncio
+async def test_async_update_partial_frame_ends_detection(monkeypatch):
+    responses = [
+        bytes.fromhex("ccf0000000102700000000000000320041000000"),
+        bytes.fromhex("ccf2000000140000000000000000000000000000"),
+        bytes.fromhex("ccf3000000003200000000000000000000000000"),
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+        bytes.fromhex("ccf405c50c0006c60c0000000000000000000000"),
+    ]
+
+    client = DummyClient(responses)
+
+    @asynccontextmanager
+    async def fake_connect(self):
+        yield client
+
+    monkeypatch.setattr(device_mod.SokBluetoothDevice, "_connect", fake_connect)
+
+    dev = device_mod.SokBluetoothDevice(BLEDevice("00:11:22:33:44:55", "Test", None))
+
+    await dev.async_update()
+
+    assert client._responses == []
+    assert dev.cell_voltages == [3.269, 3.27, 3.263, 3.264, 3.269, 3.27]
+
+
+@pytest.mark.asyncio
+async def test_send_command_skips_rejected_notification():
+    first = bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000")
+    second = bytes.fromhex("ccf405c50c0006c60c0007bf0c0008c00c000000")
+    client = NotifyClient([[first], [second]])
+    dev = device_mod.SokBluetoothDevice(BLEDevice("00:11:22:33:44:55", "Test", None))
+
+    data = await dev._send_command(client, 0xC2, 0xCCF4, lambda frame: frame[2] != 1)
+
+    assert data == second
+    assert client.writes == 2
+    assert dev.num_command_retries == 0
+
+
+@pytest.mark.asyncio
+async def test_detection_skips_repeats_like_known_count(monkeypatch):
+    first = bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000")
+    second = bytes.fromhex("ccf405c50c0006c60c0007bf0c0008c00c000000")
+    # Same sequence as test_async_update_eight_cells, then two probes
+    responses = [
+        bytes.fromhex("ccf0000000102700000000000000320041000000"),
+        bytes.fromhex("ccf2000000140000000000000000000000000000"),
+        bytes.fromhex("ccf3000000003200000000000000000000000000"),
+        first,
+        first,
+        second,
+        first,
+        second,
+    ]
+    client = DummyClient(responses)
+
+    @asynccontextmanager
+    async def fake_connect(self):
+        yield client
+
+    monkeypatch.setattr(device_mod.SokBluetoothDevice, "_connect", fake_connect)
+
+    dev = device_mod.SokBluetoothDevice(BLEDevice("00:11:22:33:44:55", "Test", None))
+
+    await dev.async_update()
+
+    assert client._responses == []
+    assert dev.cell_voltages == [3.269, 3.27, 3.263, 3.264] * 2
+    assert dev.voltage == pytest.approx(26.132)
+    assert dev._num_cells == 8
+    assert dev.num_command_retries == 0
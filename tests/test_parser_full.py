@@ -1,5 +1,6 @@
 import pytest
 
+from sok_ble.exceptions import InvalidResponseError
 from sok_ble.sok_parser import SokParser
 
 
@@ -26,3 +27,47 @@ def test_parse_all():
         "num_cycles": 50,
         "cell_voltages": [3.269, 3.27, 3.263, 3.264],
     }
+
+
+def test_parse_cells_multiple_frames():
+    frames = [
+        bytes.fromhex("ccf405c50c0006c60c0007bf0c0008c00c000000"),
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+    ]
+
+    cells = SokParser.parse_cells(frames)
+
+    assert cells == [3.269, 3.27, 3.263, 3.264] * 2
+
+
+def test_parse_cells_partial_last_frame():
+    frames = [
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+        bytes.fromhex("ccf405c50c0006c60c0000000000000000000000"),
+    ]
+
+    assert SokParser.parse_cells(frames) == [3.269, 3.27, 3.263, 3.264, 3.269, 3.27]
+
+
+def test_parse_cells_missing_cell():
+    frames = [bytes.fromhex("ccf405c50c0006c60c0007bf0c0008c00c000000")]
+
+    with pytest.raises(InvalidResponseError):
+        SokParser.parse_cells(frames)
+
+
+def test_parse_all_eight_cells():
+    responses = {
+        0xCCF0: bytes.fromhex("ccf0000000102700000000000000320041000000"),
+        0xCCF2: bytes.fromhex("ccf2000000140000000000000000000000000000"),
+        0xCCF3: bytes.fromhex("ccf3000000003200000000000000000000000000"),
+        0xCCF4: [
+            bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+            bytes.fromhex("ccf405c50c0006c60c0007bf0c0008c00c000000"),
+        ],
+    }
+
+    result = SokParser.parse_all(responses)
+
+    assert result["voltage"] == pytest.approx(26.132)
+    assert len(result["cell_voltages"]) == 8
@@ -0,0 +1,153 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from bleak.backends.device import BLEDevice
+
+from sok_ble import sok_bluetooth_device as device_mod
+from sok_ble.sok_state import SokStateStore
+
+ADDRESS = "00:11:22:33:44:55"
+
+
+def test_store_roundtrip(tmp_path):
+    path = tmp_path / "state.db"
+    store = SokStateStore(path)
+    assert store.load(ADDRESS) is None
+
+    store.save(ADDRESS, {"voltage": 13.1, "cell_voltages": [3.2, 3.3]})
+    store.close()
+
+    store = SokStateStore(path)
+    assert store.load(ADDRESS) == {"voltage": 13.1, "cell_voltages": [3.2, 3.3]}
+    assert store.addresses() == [ADDRESS]
+    store.close()
+
+
+def test_device_restores_stale_state(tmp_path):
+    store = SokStateStore(tmp_path / "state.db")
+    store.save(
+        ADDRESS,
+        {"voltage": 13.1, "capacity": 100.0, "last_update": 1000.0, "name": "Old"},
+    )
+
+    dev = device_mod.SokBluetoothDevice(BLEDevice(ADDRESS, None, None), None, store)
+
+    assert dev.stale is True
+    assert dev.voltage == 13.1
+    assert dev.capacity == 100.0
+    assert dev.last_update == 1000.0
+    assert dev.name == "Old"
+    store.close()
+
+
+def test_device_skips_invalid_stored_fields(tmp_path):
+    store = SokStateStore(tmp_path / "state.db")
+    store.save(
+        ADDRESS,
+        {
+            "voltage": "13.1",
+            "soc": 65.5,
+            "current": 2.0,
+            "cell_voltages": [3.3, None],
+            "num_samples": True,
+        },
+    )
+
+    dev = device_mod.SokBluetoothDevice(BLEDevice(ADDRESS, None, None), None, store)
+
+    assert dev.current == 2.0
+    assert dev.voltage is None
+    assert dev.soc is None
+    assert dev.cell_voltages is None
+    assert dev.num_samples == 0
+    assert dev.cell_voltage_delta is None
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_update_clears_stale_and_saves(tmp_path, monkeypatch):
+    store = SokStateStore(tmp_path / "state.db")
+    store.save(ADDRESS, {"voltage": 12.0})
+    responses = [
+        bytes.fromhex("ccf0000000102700000000000000320041000000"),
+        bytes.fromhex("ccf2000000140000000000000000000000000000"),
+        bytes.fromhex("ccf3000000003200000000000000000000000000"),
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+        # Cell count probes only get the first frame again: a 4-cell pack
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+    ]
+
+    class DummyClient:
+        async def write_gatt_char(self, uuid, data):
+            return True
+
+        async def read_gatt_char(self, uuid):
+            return responses.pop(0)
+
+    @asynccontextmanager
+    async def fake_connect(self):
+        yield DummyClient()
+
+    monkeypatch.setattr(device_mod.SokBluetoothDevice, "_connect", fake_connect)
+
+    dev = device_mod.SokBluetoothDevice(BLEDevice(ADDRESS, "Test", None), None, store)
+    await dev.async_update()
+
+    assert dev.stale is False
+    state = store.load(ADDRESS)
+    assert state["voltage"] == pytest.approx(13.066)
+    assert state["soc"] == 65
+    assert state["name"] == "Test"
+    assert state["num_samples"] == 1
+    assert state["last_update"] == dev.last_update
+    store.close()
+
+
+def test_device_restores_cell_count(tmp_path):
+    store = SokStateStore(tmp_path / "state.db")
+    store.save(ADDRESS, {"cell_voltages": [3.3] * 8})
+
+    restored = device_mod.SokBluetoothDevice(
+        BLEDevice(ADDRESS, None, None), None, store
+    )
+    explicit = device_mod.SokBluetoothDevice(
+        BLEDevice(ADDRESS, None, None), None, store, num_cells=16
+    )
+
+    assert restored._num_cells == 8
+    assert explicit._num_cells == 16
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_start_skips_cell_count_probe(tmp_path, monkeypatch):
+    store = SokStateStore(tmp_path / "state.db")
+    store.save(ADDRESS, {"cell_voltages": [3.3] * 4})
+    # No probe frames: the restored count of 4 needs a single cell frame
+    responses = [
+        bytes.fromhex("ccf0000000102700000000000000320041000000"),
+        bytes.fromhex("ccf2000000140000000000000000000000000000"),
+        bytes.fromhex("ccf3000000003200000000000000000000000000"),
+        bytes.fromhex("ccf401c50c0002c60c0003bf0c0004c00c000000"),
+    ]
+
+    class DummyClient:
+        async def write_gatt_char(self, uuid, data):
+            return True
+
+        async def read_gatt_char(self, uuid):
+            return responses.pop(0)
+
+    @asynccontextmanager
+    async def fake_connect(self):
+        yield DummyClient()
+
+    monkeypatch.setattr(device_mod.SokBluetoothDevice, "_connect", fake_connect)
+
+    dev = device_mod.SokBluetoothDevice(BLEDevice(ADDRESS, "Test", None), None, store)
+    await dev.async_update()
+
+    assert responses == []
+    assert dev.cell_voltages == [3.269, 3.27, 3.263, 3.264]
+    store.close()